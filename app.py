@@ -3,35 +3,13 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-import re
+from cleaning import CLEANED_CSV, CLEANED_PARQUET, CLEANED_DTYPES, clean_layoffs
 
 st.set_page_config(page_title="🌍 Global Layoff Trend Dashboard", layout="wide")
 
 # -------------------------
 # Helper utilities
 # -------------------------
-def clean_funds(value):
-    """Normalize funds strings like '12.3M', '$1,200', '5K' into numeric."""
-    if isinstance(value, str):
-        value = value.replace(',', '').replace('$', '').strip()
-        match = re.match(r"([\d\.]+)\s*([KMB]?)", value, re.IGNORECASE)
-        if match:
-            num, suffix = match.groups()
-            num = float(num)
-            if suffix.upper() == 'K':
-                num *= 1e3
-            elif suffix.upper() == 'M':
-                num *= 1e6
-            elif suffix.upper() == 'B':
-                num *= 1e9
-            return num
-        else:
-            return np.nan
-    elif isinstance(value, (int, float)):
-        return value
-    else:
-        return np.nan
-
 def dynamic_title(base, industry, country, fy, ty):
     """Create a compact dynamic title string based on filters."""
     parts = [f"{fy}–{ty}"]
@@ -42,68 +20,132 @@ def dynamic_title(base, industry, country, fy, ty):
     extra = " • ".join(parts)
     return f"{base} ({extra})" if extra else base
 
-def safe_groupby_sum(df, cols, value_col):
-    """Groupby guard - return empty df with expected columns if original is empty."""
-    if df.empty:
-        return pd.DataFrame(columns=cols + [value_col])
-    return df.groupby(cols, as_index=False)[value_col].sum()
+@st.cache_data(max_entries=64)
+def apply_filters(_df, frame_name, fy, ty, industry, country):
+    """Slice a frame with year/industry/country columns down to the selected filters.
+
+    `_df` is not hashed by Streamlit; the cache is keyed on `frame_name` plus the filter values.
+    """
+    # build one boolean mask and slice once instead of chaining three slices
+    mask = np.array(_df['year'].between(fy, ty), dtype=bool)
+    if industry != "All":
+        np.logical_and(mask, (_df['industry'] == industry).to_numpy(), out=mask)
+    if country != "All":
+        np.logical_and(mask, (_df['country'] == country).to_numpy(), out=mask)
+    return _df[mask]
 
 # -------------------------
-# Load data
+# Load & clean data (cached)
 # -------------------------
-try:
-    df = pd.read_csv("reports/cleaned_layoffs.csv")
+def build_cube(df):
+    """Pre-aggregate layoffs per (year, month, industry, country) so charts regroup a small frame."""
+    return df.groupby(['year', 'month', 'industry', 'country'], observed=True, as_index=False)['total_laid_off'].sum()
+
+@st.cache_data
+def load_data() -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, tuple, tuple, tuple]:
+    """Load the cleaned layoffs frame and summary once per process (reruns hit the cache).
+
+    Reads the typed Parquet copy written by `python cleaning.py`; if it is missing or its columns
+    and dtypes don't match CLEANED_DTYPES (an old copy), cleans the CSV instead. Also returns the
+    aggregated cube and the sorted sidebar options (years, industries, countries) so reruns neither
+    rehash the frame nor rescan columns.
+    """
     summary = pd.read_csv("reports/summary_insights.csv")
+
+    try:
+        df = pd.read_parquet(CLEANED_PARQUET)
+    except FileNotFoundError:
+        df = None
+    if df is None or df.dtypes.astype(str).to_dict() != CLEANED_DTYPES or list(df.columns) != list(CLEANED_DTYPES):
+        df = clean_layoffs(pd.read_csv(CLEANED_CSV))
+
+    years_sorted = tuple(int(y) for y in np.sort(df['year'].unique()))
+    industries_opt = ("All",) + tuple(sorted(df['industry'].cat.categories))
+    countries_opt = ("All",) + tuple(sorted(df['country'].cat.categories))
+    return df, build_cube(df), summary, years_sorted, industries_opt, countries_opt
+
+try:
+    df, cube, summary, years_sorted, industries_opt, countries_opt = load_data()
 except FileNotFoundError:
     st.error("⚠️ Required files not found! Please run the analysis notebooks first.")
     st.stop()
 
 # -------------------------
-# Clean & normalize dataset
+# Figure builders (cached)
 # -------------------------
-# Strip strings, handle missing
-for col in ['country', 'industry', 'location', 'company']:
-    if col in df.columns:
-        df[col] = df[col].fillna("Unknown").astype(str).str.strip()
-    else:
-        # ensure column exists to avoid KeyErrors later
-        df[col] = "Unknown"
-
-# Year handling: drop invalid years instead of converting to 0
-df['year'] = pd.to_numeric(df['year'], errors='coerce')
-df = df[df['year'].notna()]
-df['year'] = df['year'].astype(int)
-
-# Month mapping (safe)
-month_map = dict(zip(
-    ['January','February','March','April','May','June','July','August','September','October','November','December'],
-    range(1,13)))
-# If month numeric already, keep that; else map names; invalid -> 0
-def normalize_month(m):
-    if pd.isna(m):
-        return 0
-    if isinstance(m, (int, float)):
-        try:
-            return int(m)
-        except Exception:
-            return 0
-    m = str(m).strip()
-    if m.isdigit():
-        return int(m)
-    return month_map.get(m, 0)
-
-df['month'] = df['month'].apply(normalize_month).astype(int)
-
-# numeric conversions
-df['total_laid_off'] = pd.to_numeric(df.get('total_laid_off', 0), errors='coerce').fillna(0).astype(int)
-df['funds_raised_clean'] = df.get('funds_raised', np.nan).apply(clean_funds)
+# The animated figures are the slowest to build; cache them per filter state (bounded).
+# With only a handful of years a static facet grid replaces the animation entirely.
+# Data args are underscored so Streamlit keys the cache on `filter_key` only.
+@st.cache_resource(max_entries=64)
+def build_industry_anim(_animated_data, filter_key):
+    """Per-industry bar chart: animated by year, or one facet per year when there are <= 6 years."""
+    animate = _animated_data['year'].nunique() > 6
+    fig_anim = px.bar(
+        _animated_data,
+        x='industry', y='total_laid_off',
+        color='industry',
+        animation_frame='year' if animate else None,
+        facet_col=None if animate else 'year',
+        facet_col_wrap=0 if animate else 3,
+        title="Layoffs by Industry",
+        template='plotly_dark',
+        hover_data=['industry', 'total_laid_off']
+    )
+    # convert to go.Figure so we can tweak layout safely
+    fig_anim = go.Figure(fig_anim)
+    um = fig_anim.layout.updatemenus
+    if um and um[0].buttons and um[0].buttons[0].args and len(um[0].buttons[0].args) > 1:
+        um[0].buttons[0].args[1]['frame']['duration'] = 1200
+    fig_anim.update_xaxes(categoryorder='total descending')
+    fig_anim.update_layout(height=420 if animate else 640, margin=dict(t=60))
+    return fig_anim
+
+@st.cache_resource(max_entries=64)
+def build_funding_scatter(_valid, filter_key):
+    """Funds-raised vs layoffs scatter (WebGL): animated by year, or faceted when there are <= 6 years."""
+    animate = _valid['year'].nunique() > 6
+    scatter_title = "Relationship Between Funds Raised and Total Layoffs" + (" (Animated)" if animate else "")
+    plot_points = _valid
+    # Build cost grows with point count (per frame or per facet); plot only the biggest layoffs per year.
+    # (sort_index keeps the original frame order; only the plot is thinned, not `_valid` itself)
+    if len(plot_points) > 2000:
+        plot_points = plot_points.sort_values('total_laid_off', ascending=False).groupby('year', observed=True).head(200).sort_index()
+        scatter_title += " • top 200 layoffs per year"
+    fig = px.scatter(
+        plot_points,
+        x='funds_log10',
+        y='total_laid_off',
+        color='industry',
+        animation_frame='year' if animate else None,
+        facet_col=None if animate else 'year',
+        facet_col_wrap=0 if animate else 3,
+        category_orders={'year': sorted(plot_points['year'].unique())},
+        size='total_laid_off',
+        hover_name='company' if 'company' in plot_points.columns else None,
+        hover_data={'funds_log10': False, 'funds_raised_clean': ':,'},
+        title=scatter_title,
+        width=820,
+        height=420 if animate else 640,
+        template='plotly_dark',
+        render_mode='webgl'
+    )
+    um = fig.layout.updatemenus
+    if um and um[0].buttons and um[0].buttons[0].args and len(um[0].buttons[0].args) > 1:
+        um[0].buttons[0].args[1]['frame']['duration'] = 1200
+        # WebGL traces only repaint between frames with a full redraw
+        um[0].buttons[0].args[1]['frame']['redraw'] = True
+    # x is already log10(funds): label whole powers of ten with the raw amounts
+    decades = range(int(np.floor(plot_points['funds_log10'].min())), int(np.ceil(plot_points['funds_log10'].max())) + 1)
+    fig.update_xaxes(tickvals=list(decades), ticktext=[f"{10.0 ** d:,.0f}" if d >= 0 else f"{10.0 ** d:g}" for d in decades])
+    fig.for_each_xaxis(lambda ax: ax.update(title_text='funds_raised_clean') if ax.title.text else None)
+    fig.update_layout(margin=dict(l=20, r=20, t=60, b=30))
+    return fig
 
 # -------------------------
 # Sidebar Filters
 # -------------------------
 st.sidebar.header("🔎 Filter Data")
 
-years_sorted = sorted(df['year'].unique())
 if not years_sorted:
     st.sidebar.error("No valid years present in dataset.")
     st.stop()
@@ -112,12 +154,8 @@ if not years_sorted:
 from_year = st.sidebar.selectbox("From Year", years_sorted, index=0)
 to_year = st.sidebar.selectbox("To Year", years_sorted, index=len(years_sorted)-1)
 
-# industry & country lists
-industries = ["All"] + sorted(df['industry'].dropna().unique().tolist())
-countries = ["All"] + sorted(df['country'].dropna().unique().tolist())
-
-industry = st.sidebar.selectbox("Select Industry", industries)
-country = st.sidebar.selectbox("Select Country", countries)
+industry = st.sidebar.selectbox("Select Industry", industries_opt)
+country = st.sidebar.selectbox("Select Country", countries_opt)
 
 # Show selected filters compactly
 st.sidebar.markdown("---")
@@ -129,12 +167,11 @@ st.sidebar.markdown(f"**Selected:** {industry} • {country} • {from_year}–{
 # Ensure from_year <= to_year by swapping if user picks in reverse
 if from_year > to_year:
     from_year, to_year = to_year, from_year
+filter_key = (from_year, to_year, industry, country)
 
-filtered = df[df['year'].between(from_year, to_year)]
-if industry != "All":
-    filtered = filtered[filtered['industry'] == industry]
-if country != "All":
-    filtered = filtered[filtered['country'] == country]
+# raw rows are only needed for the per-company funding scatter; every other chart uses the cube
+filtered = apply_filters(df, "rows", from_year, to_year, industry, country)
+filtered_cube = apply_filters(cube, "cube", from_year, to_year, industry, country)
 
 # -------------------------
 # Dynamic Headings
@@ -147,35 +184,28 @@ if " • All countries" in main_title:
     main_title = main_title.replace(" • All countries", "")
 
 st.markdown(f"<h1 style='text-align:center;'>📊 {main_title}</h1>", unsafe_allow_html=True)
-st.markdown("<h4 style='text-align:center; color:gray;'>Interactive Insights • Animated Visuals • Real Data</h4>", unsafe_allow_html=True)
+# the charts only animate past six years (see the figure builders); otherwise don't advertise it
+visuals = " • Animated Visuals" if filtered['year'].nunique() > 6 else ""
+st.markdown(f"<h4 style='text-align:center; color:gray;'>Interactive Insights{visuals} • Real Data</h4>", unsafe_allow_html=True)
 st.write("---")
 
+# nothing below can render without rows - stop once instead of guarding every section
+if filtered.empty:
+    st.warning("No data for selected filters.")
+    st.stop()
+
 # -------------------------
-# Summary calculations (guarded)
+# Summary calculations
 # -------------------------
-if not filtered.empty:
-    yearly_totals = filtered.groupby('year')['total_laid_off'].sum().sort_index()
-    yoy_changes = yearly_totals.pct_change().dropna() * 100
-    avg_yoy_change = float(yoy_changes.mean()) if not yoy_changes.empty else 0.0
-    peak_year = int(yearly_totals.idxmax()) if not yearly_totals.empty else "N/A"
-    # top industry/country within the filtered subset
-    try:
-        top_industry = filtered.groupby('industry')['total_laid_off'].sum().idxmax()
-    except Exception:
-        top_industry = "N/A"
-    try:
-        top_country = filtered.groupby('country')['total_laid_off'].sum().idxmax()
-    except Exception:
-        top_country = "N/A"
-    year_min = int(filtered['year'].min())
-    year_max = int(filtered['year'].max())
-else:
-    avg_yoy_change = 0.0
-    peak_year = "N/A"
-    top_industry = "N/A"
-    top_country = "N/A"
-    year_min = from_year
-    year_max = to_year
+yearly_totals = filtered_cube.groupby('year', observed=True)['total_laid_off'].sum().sort_index()
+yoy_changes = yearly_totals.pct_change().dropna() * 100
+avg_yoy_change = float(yoy_changes.mean()) if not yoy_changes.empty else 0.0
+peak_year = int(yearly_totals.idxmax())
+# top industry/country within the filtered subset
+top_industry = filtered_cube.groupby('industry', observed=True)['total_laid_off'].sum().idxmax()
+top_country = filtered_cube.groupby('country', observed=True)['total_laid_off'].sum().idxmax()
+year_min = int(filtered_cube['year'].min())
+year_max = int(filtered_cube['year'].max())
 
 # -------------------------
 # Key Metrics (dynamic heading)
@@ -183,7 +213,7 @@ else:
 st.subheader(dynamic_title("📈 Key Metrics Overview", industry, country, from_year, to_year))
 col1, col2, col3, col4 = st.columns(4)
 
-total_layoffs_val = int(filtered['total_laid_off'].sum()) if not filtered.empty else 0
+total_layoffs_val = int(filtered_cube['total_laid_off'].sum())
 col1.metric("Total Layoffs", f"{total_layoffs_val:,}")
 col2.metric("Peak Year", peak_year)
 col3.metric("Top Industry", top_industry)
@@ -194,48 +224,24 @@ st.write("---")
 # Industry-wise Trends (dynamic)
 # -------------------------
 st.subheader(dynamic_title("🎬 Industry-wise Layoff Trends", industry, country, from_year, to_year))
-animated_data = safe_groupby_sum(filtered, ['year', 'industry'], 'total_laid_off')
-
-if animated_data.empty:
-    st.info("No data available for the selected filters.")
-else:
-    fig_anim = px.bar(
-        animated_data,
-        x='industry', y='total_laid_off',
-        color='industry',
-        animation_frame='year',
-        title="Layoffs by Industry",
-        template='plotly_dark',
-        hover_data=['industry', 'total_laid_off']
-    )
-    # convert to go.Figure so we can tweak layout safely
-    fig_anim = go.Figure(fig_anim)
-    try:
-        if fig_anim.layout.updatemenus:
-            fig_anim.layout.updatemenus[0].buttons[0].args[1]['frame']['duration'] = 1200
-    except Exception:
-        pass
-    fig_anim.update_layout(xaxis={'categoryorder': 'total descending'}, height=420, margin=dict(t=60))
-    st.plotly_chart(fig_anim, use_container_width=True)
+animated_data = filtered_cube.groupby(['year', 'industry'], observed=True, as_index=False)['total_laid_off'].sum()
+fig_anim = build_industry_anim(animated_data, filter_key)
+st.plotly_chart(fig_anim, use_container_width=True)
 
 # -------------------------
 # Yearly Layoff Trend
 # -------------------------
 st.subheader(dynamic_title("📅 Total Layoffs per Year", industry, country, from_year, to_year))
-yearly = filtered.groupby('year')['total_laid_off'].sum().reset_index()
-
-if yearly.empty:
-    st.info("No yearly data to show for selected filters.")
-else:
-    fig2 = px.line(
-        yearly, x='year', y='total_laid_off',
-        markers=True, text='total_laid_off',
-        template='plotly_dark',
-        title="Yearly Layoff Trend",
-        height=340
-    )
-    fig2.update_traces(textposition="top center")
-    st.plotly_chart(fig2, use_container_width=True)
+yearly = filtered_cube.groupby('year', observed=True)['total_laid_off'].sum().reset_index()
+fig2 = px.line(
+    yearly, x='year', y='total_laid_off',
+    markers=True, text='total_laid_off',
+    template='plotly_dark',
+    title="Yearly Layoff Trend",
+    height=340
+)
+fig2.update_traces(textposition="top center")
+st.plotly_chart(fig2, use_container_width=True)
 
 # -------------------------
 # Top Industries & Countries
@@ -243,87 +249,69 @@ else:
 col1, col2 = st.columns(2)
 with col1:
     st.subheader(dynamic_title("🏭 Top Industries by Layoffs", industry, country, from_year, to_year))
-    if filtered.empty:
-        st.info("No data to display.")
-    else:
-        top_ind = filtered.groupby('industry')['total_laid_off'].sum().sort_values(ascending=False).head(10).reset_index()
-        if top_ind.empty:
-            st.info("No industries to display.")
-        else:
-            fig3 = px.bar(
-                top_ind,
-                x='total_laid_off', y='industry',
-                orientation='h',
-                color='total_laid_off',
-                color_continuous_scale='bluered',
-                title="Top Industries",
-                template='plotly_dark',
-                height=340
-            )
-            st.plotly_chart(fig3, use_container_width=True)
+    top_ind = filtered_cube.groupby('industry', observed=True)['total_laid_off'].sum().nlargest(10).reset_index()
+    fig3 = px.bar(
+        top_ind,
+        x='total_laid_off', y='industry',
+        orientation='h',
+        color='total_laid_off',
+        color_continuous_scale='bluered',
+        title="Top Industries",
+        template='plotly_dark',
+        height=340
+    )
+    st.plotly_chart(fig3, use_container_width=True)
 with col2:
     st.subheader(dynamic_title("🌎 Top Countries by Layoffs", industry, country, from_year, to_year))
-    if filtered.empty:
-        st.info("No data to display.")
-    else:
-        top_cty = filtered.groupby('country')['total_laid_off'].sum().sort_values(ascending=False).head(10).reset_index()
-        if top_cty.empty:
-            st.info("No countries to display.")
-        else:
-            fig4 = px.bar(
-                top_cty,
-                x='total_laid_off', y='country',
-                orientation='h',
-                color='total_laid_off',
-                color_continuous_scale='tealrose',
-                title="Top Countries",
-                template='plotly_dark',
-                height=340
-            )
-            st.plotly_chart(fig4, use_container_width=True)
+    top_cty = filtered_cube.groupby('country', observed=True)['total_laid_off'].sum().nlargest(10).reset_index()
+    fig4 = px.bar(
+        top_cty,
+        x='total_laid_off', y='country',
+        orientation='h',
+        color='total_laid_off',
+        color_continuous_scale='tealrose',
+        title="Top Countries",
+        template='plotly_dark',
+        height=340
+    )
+    st.plotly_chart(fig4, use_container_width=True)
 
 # -------------------------
 # Monthly Heatmap
 # -------------------------
 st.subheader(dynamic_title("🔥 Monthly Layoff Distribution Heatmap", industry, country, from_year, to_year))
-if not filtered.empty:
-    heatmap = filtered.groupby(['year','month'])['total_laid_off'].sum().unstack().fillna(0)
-    st.dataframe(heatmap.style.background_gradient(cmap='Reds', axis=None))
-else:
-    st.info("No monthly distribution to show for selected filters.")
+heatmap = filtered_cube.pivot_table(index='year', columns='month', values='total_laid_off', aggfunc='sum', fill_value=0, observed=True)
+# one image trace instead of a per-cell styled HTML table (cell counts still printed via text_auto)
+fig_h = px.imshow(
+    heatmap.values,
+    x=list(heatmap.columns), y=list(heatmap.index),
+    labels=dict(x='month', y='year', color='total_laid_off'),
+    color_continuous_scale='Reds',
+    text_auto=True,
+    aspect='auto',
+    template='plotly_dark'
+)
+fig_h.update_xaxes(type='category')
+fig_h.update_yaxes(type='category')
+st.plotly_chart(fig_h, use_container_width=True)
 
 # -------------------------
 # Funding vs Layoffs
 # -------------------------
 st.subheader(dynamic_title("💸 Relationship Between Funding and Layoffs", industry, country, from_year, to_year))
-valid = filtered[filtered['funds_raised_clean'].notnull() & (filtered['funds_raised_clean'] > 0)]
+# finite and positive only: log10 of anything else can't be placed on the axis
+valid = filtered[np.isfinite(filtered['funds_raised_clean']) & (filtered['funds_raised_clean'] > 0)]
 if valid.shape[0] == 0:
     st.warning("No funding data available for visualization for the current filters.")
 else:
-    fig = px.scatter(
-        valid,
-        x='funds_raised_clean',
-        y='total_laid_off',
-        color='industry',
-        animation_frame='year' if 'year' in valid.columns else None,
-        size='total_laid_off',
-        hover_name='company' if 'company' in valid.columns else None,
-        log_x=True,
-        title="Relationship Between Funds Raised and Total Layoffs (Animated)",
-        width=820,
-        height=420,
-        template='plotly_dark'
-    )
-    fig = go.Figure(fig)
-    try:
-        if fig.layout.updatemenus:
-            fig.layout.updatemenus[0].buttons[0].args[1]['frame']['duration'] = 1200
-    except Exception:
-        pass
-    fig.update_layout(margin=dict(l=20, r=20, t=60, b=30))
+    fig = build_funding_scatter(valid, filter_key)
     st.plotly_chart(fig, use_container_width=False)
 
-    corr = valid[['funds_raised_clean', 'total_laid_off']].corr().iloc[0, 1]
+    x = valid['funds_raised_clean'].to_numpy(dtype=float)
+    y = valid['total_laid_off'].to_numpy(dtype=float)
+    finite = np.isfinite(x) & np.isfinite(y)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = float(np.corrcoef(x[finite], y[finite])[0, 1]) if finite.sum() > 1 else float('nan')
     if pd.isna(corr):
         corr_text = "Insufficient numeric data to calculate correlation."
     else:
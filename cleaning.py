@@ -0,0 +1,76 @@
+"""Cleaning pipeline shared by the dashboard and the one-time Parquet export.
+
+Run `python cleaning.py` after the analysis notebooks to write reports/cleaned_layoffs.parquet;
+the dashboard reads that file and only falls back to cleaning the CSV when it is missing.
+"""
+import pandas as pd
+import numpy as np
+import re
+
+CLEANED_CSV = "reports/cleaned_layoffs.csv"
+CLEANED_PARQUET = "reports/cleaned_layoffs.parquet"
+CLEANED_DTYPES = {
+    'year': 'int16', 'month': 'int8',
+    'industry': 'category', 'country': 'category', 'company': 'category',
+    'total_laid_off': 'int32', 'funds_raised_clean': 'float64', 'funds_log10': 'float64',
+}
+
+# Month mapping (safe)
+month_map = dict(zip(
+    ['January','February','March','April','May','June','July','August','September','October','November','December'],
+    range(1,13)))
+
+def clean_layoffs(df):
+    """Normalize the raw cleaned_layoffs.csv frame into the typed, narrow frame the dashboard uses."""
+    # Strip strings, handle missing
+    for col in ['country', 'industry', 'company']:
+        if col in df.columns:
+            df[col] = df[col].fillna("Unknown").astype(str).str.strip()
+        else:
+            # ensure column exists to avoid KeyErrors later
+            df[col] = "Unknown"
+
+    # Year handling: drop invalid years instead of converting to 0 (int16 keeps the filter scans narrow;
+    # years outside its range count as invalid so the cast can't wrap)
+    year = pd.to_numeric(df['year'], errors='coerce')
+    year = year.where(year.between(np.iinfo('int16').min, np.iinfo('int16').max))
+    df = df.loc[year.notna()].assign(year=year.dropna().astype('int16'))
+
+    # low-cardinality keys: categorical codes make groupby/filtering cheaper.
+    # Cast after the year drop so the categories (and sidebar options) only hold levels with data.
+    for col in ['country', 'industry', 'company']:
+        df[col] = df[col].astype('category')
+
+    # If month numeric already, keep that; else map names; invalid (incl. outside 1-12) -> 0
+    month_num = pd.to_numeric(df['month'], errors='coerce')
+    month_names = df['month'].astype(str).str.strip().map(month_map)
+    month = month_num.fillna(month_names)
+    df['month'] = month.where(month.between(1, 12), 0).astype('int8')
+
+    # numeric conversions
+    # values that don't fit int32 are treated like unparseable ones (-> 0) instead of wrapping
+    laid_off = pd.to_numeric(df.get('total_laid_off', pd.Series(0, index=df.index)), errors='coerce')
+    laid_off = laid_off.where(laid_off.between(np.iinfo('int32').min, np.iinfo('int32').max))
+    df['total_laid_off'] = laid_off.fillna(0).astype('int32')
+    # An already-numeric column passes through unchanged; otherwise every string goes through the parse
+    funds = df.get('funds_raised', pd.Series(np.nan, index=df.index))
+    if pd.api.types.is_numeric_dtype(funds):
+        funds_clean = funds.astype('float64')
+    else:
+        # Normalize funds strings like '12.3M', '$1,200', '5K' into numeric in one vectorized pass
+        text = funds.dropna().astype(str).str.replace(r'[\$,]', '', regex=True).str.strip()
+        ext = text.str.extract(r'^([\d.]+)\s*([KMB]?)', flags=re.IGNORECASE)
+        suffix = ext[1].fillna('').str.upper()
+        mult = np.select([suffix.eq('K'), suffix.eq('M'), suffix.eq('B')], [1e3, 1e6, 1e9], default=1.0)
+        funds_clean = (pd.to_numeric(ext[0], errors='coerce') * mult).reindex(df.index)
+    # inf/-inf (e.g. a numeric column holding inf) count as missing
+    df['funds_raised_clean'] = funds_clean.where(np.isfinite(funds_clean)).astype('float64')
+    # log10 once here so the scatter can use a plain linear axis (non-positive -> NaN)
+    df['funds_log10'] = np.log10(df['funds_raised_clean'].where(df['funds_raised_clean'] > 0))
+
+    # keep only what the dashboard reads so every filtered copy stays narrow
+    return df[list(CLEANED_DTYPES)]
+
+if __name__ == "__main__":
+    clean_layoffs(pd.read_csv(CLEANED_CSV)).to_parquet(CLEANED_PARQUET, index=False)
+    print(f"Wrote {CLEANED_PARQUET}")